@@ -1,21 +1,61 @@
+import asyncio
+import logging
 import os
+from contextlib import asynccontextmanager, suppress
 from dataclasses import asdict
-from typing import List, Literal, Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Literal, Optional, Tuple
 
+import httpx
+import orjson
+from cachetools import TTLCache
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 
-from recommender import Recommender, VideoRecommendation
+from recommender import Recommender
 from youtube_service import YouTubeService
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared services once at startup and release them on shutdown.
+
+    The HTTP/2 client is pooled so YouTube calls reuse one connection.
+    """
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+        timeout=10.0,
+    )
+    api_key = os.getenv("YOUTUBE_API_KEY")
+    app.state.yt = YouTubeService(api_key, client=app.state.http) if api_key else None
+    app.state.rec = Recommender()
+
+    prefetch_task = None
+    if app.state.yt is not None and app.state.rec.config.get("prefetch", {}).get("enabled"):
+        prefetch_task = asyncio.create_task(prefetch_popular_searches(app))
+    try:
+        yield
+    finally:
+        if prefetch_task is not None:
+            prefetch_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await prefetch_task
+        await app.state.http.aclose()
+
+
 app = FastAPI(
     title="YouTube Tutorial Recommender",
     description="Search and recommend YouTube video tutorials based on quality metrics",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration for frontend
@@ -27,29 +67,113 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-youtube_service: Optional[YouTubeService] = None
-recommender: Optional[Recommender] = None
+# Cache of YouTube search + details results, keyed on query and filters
+SearchCacheKey = Tuple[str, int, Optional[str], Optional[str]]
+search_cache: TTLCache = TTLCache(maxsize=1024, ttl=900)
+search_locks: Dict[SearchCacheKey, asyncio.Lock] = {}
+search_lock_users: Dict[SearchCacheKey, int] = {}  # Holders + waiters per lock
+SEARCH_CACHE_HEADERS = {"Cache-Control": "public, max-age=600"}
 
 
-def get_youtube_service() -> YouTubeService:
-    global youtube_service
-    if youtube_service is None:
-        api_key = os.getenv("YOUTUBE_API_KEY")
-        if not api_key:
-            raise HTTPException(
-                status_code=500,
-                detail="YouTube API key not configured"
-            )
-        youtube_service = YouTubeService(api_key)
-    return youtube_service
+def get_youtube_service(request: Request) -> YouTubeService:
+    yt_service = request.app.state.yt
+    if yt_service is None:
+        raise HTTPException(
+            status_code=500,
+            detail="YouTube API key not configured"
+        )
+    return yt_service
 
 
-def get_recommender() -> Recommender:
-    global recommender
-    if recommender is None:
-        recommender = Recommender()
-    return recommender
+def get_recommender(request: Request) -> Recommender:
+    return request.app.state.rec
+
+
+async def get_videos_cached(
+    yt_service: YouTubeService,
+    query: str,
+    max_results: int,
+    published_after: Optional[datetime] = None,
+    video_duration: Optional[str] = None,
+    refresh: bool = False,
+) -> List[dict]:
+    """Return search results with details, serving repeated queries from cache.
+
+    Concurrent misses for the same key share a single YouTube round-trip.
+    With refresh=True the cached entry is ignored and overwritten.
+    """
+    published_after_day = published_after.date().isoformat() if published_after else None
+    key = (query, max_results, published_after_day, video_duration)
+
+    if not refresh:
+        videos = search_cache.get(key)
+        if videos is not None:
+            return videos
+
+    lock = search_locks.get(key)
+    if lock is None:
+        lock = search_locks[key] = asyncio.Lock()
+    search_lock_users[key] = search_lock_users.get(key, 0) + 1
+    try:
+        async with lock:
+            videos = None if refresh else search_cache.get(key)
+            if videos is None:
+                videos = await yt_service.search_and_get_details(
+                    query=query,
+                    max_results=max_results,
+                    published_after=published_after,
+                    video_duration=video_duration,
+                )
+                search_cache[key] = videos
+    finally:
+        # Drop the lock only once no task holds or waits on it
+        remaining = search_lock_users[key] - 1
+        if remaining:
+            search_lock_users[key] = remaining
+        else:
+            del search_lock_users[key]
+            if search_locks.get(key) is lock:
+                del search_locks[key]
+    return videos
+
+
+async def prefetch_popular_searches(app: FastAPI) -> None:
+    """Periodically refresh the search cache for the configured technologies.
+
+    All queries in a round are fetched concurrently; failures are logged
+    so one bad query does not stop the rest.
+    """
+    yt_service: YouTubeService = app.state.yt
+    rec_engine: Recommender = app.state.rec
+    prefetch_config = rec_engine.config["prefetch"]
+    interval = prefetch_config.get("interval_minutes", 10) * 60
+
+    queries = []
+    for technology in prefetch_config.get("technologies", []):
+        try:
+            queries.append(SearchRequest(technology=technology).build_query())
+        except ValidationError:
+            logger.warning("Skipping invalid prefetch technology %r", technology)
+    if not queries:
+        return
+
+    while True:
+        results = await asyncio.gather(
+            *(
+                get_videos_cached(
+                    yt_service,
+                    query=query,
+                    max_results=rec_engine.filters["default_max_results"],
+                    refresh=True,
+                )
+                for query in queries
+            ),
+            return_exceptions=True,
+        )
+        for query, result in zip(queries, results):
+            if isinstance(result, Exception):
+                logger.warning("Prefetch failed for %r: %s", query, result)
+        await asyncio.sleep(interval)
 
 
 class SearchRequest(BaseModel):
@@ -72,15 +196,9 @@ class SearchRequest(BaseModel):
 
     def build_query(self) -> str:
         """Build YouTube search query from structured parameters"""
-        parts = [self.technology, "tutorial"]
         if self.level:
-            level_terms = {
-                "beginner": "beginner",
-                "intermediate": "intermediate",
-                "advanced": "advanced"
-            }
-            parts.append(level_terms[self.level])
-        return " ".join(parts)
+            return " ".join((self.technology, "tutorial", self.level))
+        return " ".join((self.technology, "tutorial"))
 
 
 class ScoreBreakdownResponse(BaseModel):
@@ -90,6 +208,7 @@ class ScoreBreakdownResponse(BaseModel):
     views: float
     recency: float
     duration_match: float
+    comment_quality: float
 
 
 class VideoResponse(BaseModel):
@@ -119,8 +238,12 @@ async def health_check():
     return {"status": "healthy", "service": "youtube-recommender"}
 
 
-@app.post("/api/search", response_model=SearchResponse)
-async def search_videos(request: SearchRequest):
+@app.post("/api/search", responses={200: {"model": SearchResponse}})
+async def search_videos(
+    request: SearchRequest,
+    yt_service: YouTubeService = Depends(get_youtube_service),
+    rec_engine: Recommender = Depends(get_recommender),
+):
     """Search for videos and return recommendations.
 
     This endpoint:
@@ -130,9 +253,6 @@ async def search_videos(request: SearchRequest):
     4. Scores videos based on relevance, quality, recency, etc.
     5. Returns top 3 recommended videos
     """
-    yt_service = get_youtube_service()
-    rec_engine = get_recommender()
-
     # Build query from structured parameters
     query = request.build_query()
 
@@ -140,8 +260,9 @@ async def search_videos(request: SearchRequest):
     published_after = YouTubeService.get_published_after_from_months(request.max_months)
 
     try:
-        # Search and get video details
-        videos = yt_service.search_and_get_details(
+        # Search and get video details (cached per query and filters)
+        videos = await get_videos_cached(
+            yt_service,
             query=query,
             max_results=rec_engine.filters["default_max_results"],
             published_after=published_after,
@@ -149,50 +270,106 @@ async def search_videos(request: SearchRequest):
         )
 
         if not videos:
-            return SearchResponse(query=query, recommendations=[])
+            return Response(
+                content=orjson.dumps({"query": query, "recommendations": []}),
+                media_type="application/json",
+                headers=SEARCH_CACHE_HEADERS,
+            )
+
+        # Run enabled analyzers concurrently across all videos
+        analysis = await rec_engine.analyze_all(videos)
 
         # Rank videos and get recommendations
         recommendations = rec_engine.rank_videos(
             videos=videos,
             duration_preference=request.duration_preference,
+            analysis=analysis,
         )
 
-        # Convert to response format
-        response_recommendations = []
-        for rec in recommendations:
-            breakdown = ScoreBreakdownResponse(
-                relevance=round(rec.score_breakdown.relevance, 4),
-                like_ratio=round(rec.score_breakdown.like_ratio, 4),
-                views=round(rec.score_breakdown.views, 4),
-                recency=round(rec.score_breakdown.recency, 4),
-                duration_match=round(rec.score_breakdown.duration_match, 4),
-            )
-            response_recommendations.append(
-                VideoResponse(
-                    video_id=rec.video_id,
-                    title=rec.title,
-                    channel=rec.channel,
-                    thumbnail=rec.thumbnail,
-                    duration=rec.duration,
-                    duration_seconds=rec.duration_seconds,
-                    view_count=rec.view_count,
-                    like_count=rec.like_count,
-                    published_at=rec.published_at,
-                    score=rec.score,
-                    score_breakdown=breakdown,
-                )
-            )
-
-        return SearchResponse(
-            query=query,
-            recommendations=response_recommendations,
+        # Recommendations are built from trusted internal data, so skip
+        # response-model validation and serialize the dataclasses directly
+        return Response(
+            content=orjson.dumps(
+                {
+                    "query": query,
+                    "recommendations": [asdict(rec) for rec in recommendations],
+                }
+            ),
+            media_type="application/json",
+            headers=SEARCH_CACHE_HEADERS,
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def sse_event(event: str, data: object) -> bytes:
+    """Encode one Server-Sent Events message with a JSON payload"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+@app.post("/api/search/stream")
+async def search_videos_stream(
+    request: SearchRequest,
+    yt_service: YouTubeService = Depends(get_youtube_service),
+    rec_engine: Recommender = Depends(get_recommender),
+):
+    """Search for videos and stream recommendations as Server-Sent Events.
+
+    Events, in order:
+    - meta: {"query": ...}, sent before YouTube is queried
+    - recommendation: one per recommended video, best first
+    - recommendations: full re-ranked list, only when analyzers are enabled
+    - done: {} once the stream is complete (or error: {"detail": ...})
+    """
+    query = request.build_query()
+    published_after = YouTubeService.get_published_after_from_months(request.max_months)
+
+    async def events() -> AsyncIterator[bytes]:
+        yield sse_event("meta", {"query": query})
+        try:
+            videos = await get_videos_cached(
+                yt_service,
+                query=query,
+                max_results=rec_engine.filters["default_max_results"],
+                published_after=published_after,
+                video_duration=None,
+            )
+
+            if videos:
+                # Stream the ranking that needs no analyzers first
+                recommendations = rec_engine.rank_videos(
+                    videos=videos,
+                    duration_preference=request.duration_preference,
+                )
+                for rec in recommendations:
+                    yield sse_event("recommendation", asdict(rec))
+
+                # Then patch with the analyzer-adjusted ranking, if any
+                if any(a.is_enabled for a in rec_engine.analyzers):
+                    analysis = await rec_engine.analyze_all(videos)
+                    recommendations = rec_engine.rank_videos(
+                        videos=videos,
+                        duration_preference=request.duration_preference,
+                        analysis=analysis,
+                    )
+                    yield sse_event(
+                        "recommendations", [asdict(rec) for rec in recommendations]
+                    )
+
+            yield sse_event("done", {})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
+    # loop/http "auto" pick uvloop and httptools when installed (uvicorn[standard])
     uvicorn.run(app, host="0.0.0.0", port=port)
@@ -1,15 +1,57 @@
+import asyncio
+import calendar
 import math
+import os
+import time
+from collections import namedtuple
 from dataclasses import dataclass, field
-from datetime import datetime
 from typing import Dict, List, Optional
 
+import numpy as np
 import yaml
 
-from analyzers import BaseAnalyzer, CommentAnalyzer
+from _scoring_numba import PREF_ANY, PREFERENCE_CODES, score_components
+from analyzers import AnalysisResult, BaseAnalyzer, CommentAnalyzer
 from youtube_service import YouTubeService
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
 
-@dataclass
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
+
+# Scoring weights, one field per "<name>_weight" key in the scoring config
+Weights = namedtuple(
+    "Weights",
+    "relevance like_ratio view_count recency duration_match comment_quality",
+)
+
+
+def load_config(config_path: str) -> dict:
+    """Load the recommender YAML configuration"""
+    with open(config_path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+
+def weights_from_config(scoring: dict) -> Weights:
+    """Build the Weights tuple from the scoring section of the config"""
+    return Weights(
+        relevance=scoring["relevance_weight"],
+        like_ratio=scoring["like_ratio_weight"],
+        view_count=scoring["view_count_weight"],
+        recency=scoring["recency_weight"],
+        duration_match=scoring["duration_match_weight"],
+        comment_quality=scoring.get("comment_quality_weight", 0.0),
+    )
+
+
+# Parsed once at import; Recommender instances share it unless given another path
+_CONFIG = load_config(DEFAULT_CONFIG_PATH)
+_WEIGHTS = weights_from_config(_CONFIG["scoring"])
+
+
+@dataclass(slots=True)
 class ScoreBreakdown:
     """Breakdown of how the final score was calculated"""
     relevance: float = 0.0
@@ -17,10 +59,10 @@ class ScoreBreakdown:
     views: float = 0.0
     recency: float = 0.0
     duration_match: float = 0.0
-    comment_quality: float = 0.0  # Reserved for future
+    comment_quality: float = 0.0  # From analyzers; weight defaults to 0
 
 
-@dataclass
+@dataclass(slots=True)
 class VideoRecommendation:
     """A recommended video with all its details"""
     video_id: str
@@ -39,14 +81,38 @@ class VideoRecommendation:
 class Recommender:
     """Video recommendation engine using configurable scoring weights"""
 
-    def __init__(self, config_path: str = "config.yaml"):
-        with open(config_path, "r", encoding="utf-8") as f:
-            self.config = yaml.safe_load(f)
+    __slots__ = (
+        "config",
+        "weights",
+        "filters",
+        "duration_ranges",
+        "analyzers",
+        "_short_max",
+        "_med_min",
+        "_med_max",
+        "_long_min",
+    )
+
+    # Upper bound on concurrent analyzer calls (each may hit the YouTube API)
+    MAX_CONCURRENT_ANALYSES = 8
+
+    def __init__(self, config_path: Optional[str] = None):
+        if config_path is None:
+            self.config = _CONFIG
+            self.weights = _WEIGHTS
+        else:
+            self.config = load_config(config_path)
+            self.weights = weights_from_config(self.config["scoring"])
 
-        self.weights = self.config["scoring"]
         self.filters = self.config["filters"]
         self.duration_ranges = self.config["duration_ranges"]
 
+        # Duration range bounds in minutes, bound once for the scoring hot path
+        self._short_max = float(self.duration_ranges["short"]["max_minutes"])
+        self._med_min = float(self.duration_ranges["medium"]["min_minutes"])
+        self._med_max = float(self.duration_ranges["medium"]["max_minutes"])
+        self._long_min = float(self.duration_ranges["long"]["min_minutes"])
+
         # Initialize analyzers
         self.analyzers: List[BaseAnalyzer] = []
         comment_config = self.config.get("comment_analysis", {})
@@ -106,29 +172,41 @@ class Recommender:
 
         return min(1.0, log_views / 7)  # 10M views = log10(10^7) = 7
 
-    def calculate_recency_score(self, published_at: str) -> float:
-        """Calculate score based on how recent the video is.
+    @staticmethod
+    def days_since_published(published_at: str) -> Optional[int]:
+        """Whole days since a YouTube publish time ("2024-01-15T10:00:00Z").
 
-        Newer videos get higher scores.
+        Returns:
+            Days since publication, or None if the string can't be parsed
         """
         try:
-            pub_date = datetime.fromisoformat(published_at.replace("Z", "+00:00"))
-            now = datetime.now(pub_date.tzinfo)
-            days_old = (now - pub_date).days
-
-            if days_old <= 30:
-                return 1.0
-            elif days_old <= 90:
-                return 0.9 - (days_old - 30) / 600  # 0.8 to 0.9
-            elif days_old <= 365:
-                return 0.7 - (days_old - 90) / 1100  # 0.45 to 0.7
-            elif days_old <= 730:
-                return 0.4 - (days_old - 365) / 1825  # 0.2 to 0.4
-            else:
-                return max(0.1, 0.2 - (days_old - 730) / 3650)
+            pub_ts = calendar.timegm(time.strptime(published_at[:19], "%Y-%m-%dT%H:%M:%S"))
         except (ValueError, TypeError):
+            return None
+        return (int(time.time()) - pub_ts) // 86400
+
+    def calculate_recency_score(self, days_old: Optional[int]) -> float:
+        """Calculate score based on how recent the video is.
+
+        Newer videos get higher scores.
+
+        Args:
+            days_old: Whole days since publication, or None if unknown
+        """
+        if days_old is None:
             return 0.5  # Default for unparseable dates
 
+        if days_old <= 30:
+            return 1.0
+        elif days_old <= 90:
+            return 0.9 - (days_old - 30) / 600  # 0.8 to 0.9
+        elif days_old <= 365:
+            return 0.7 - (days_old - 90) / 1100  # 0.45 to 0.7
+        elif days_old <= 730:
+            return 0.4 - (days_old - 365) / 1825  # 0.2 to 0.4
+        else:
+            return max(0.1, 0.2 - (days_old - 730) / 3650)
+
     def calculate_duration_match_score(
         self, duration_seconds: int, preference: Optional[str]
     ) -> float:
@@ -144,29 +222,25 @@ class Recommender:
         duration_minutes = duration_seconds / 60
 
         if preference == "short":
-            max_minutes = self.duration_ranges["short"]["max_minutes"]
-            if duration_minutes <= max_minutes:
+            if duration_minutes <= self._short_max:
                 return 1.0
-            elif duration_minutes <= max_minutes * 2:
+            elif duration_minutes <= self._short_max * 2:
                 return 0.5
             return 0.2
 
         elif preference == "medium":
-            min_minutes = self.duration_ranges["medium"]["min_minutes"]
-            max_minutes = self.duration_ranges["medium"]["max_minutes"]
-            if min_minutes <= duration_minutes <= max_minutes:
+            if self._med_min <= duration_minutes <= self._med_max:
                 return 1.0
-            elif duration_minutes < min_minutes:
+            elif duration_minutes < self._med_min:
                 return 0.7
-            elif duration_minutes <= max_minutes * 1.5:
+            elif duration_minutes <= self._med_max * 1.5:
                 return 0.6
             return 0.3
 
         elif preference == "long":
-            min_minutes = self.duration_ranges["long"]["min_minutes"]
-            if duration_minutes >= min_minutes:
+            if duration_minutes >= self._long_min:
                 return 1.0
-            elif duration_minutes >= min_minutes * 0.5:
+            elif duration_minutes >= self._long_min * 0.5:
                 return 0.6
             return 0.3
 
@@ -178,40 +252,43 @@ class Recommender:
         search_rank: int,
         max_results: int,
         all_view_counts: List[int],
+        duration_seconds: int,
         duration_preference: Optional[str] = None,
+        analysis_score: float = 0.0,
     ) -> tuple[float, ScoreBreakdown]:
         """Calculate the final recommendation score for a video.
 
+        Args:
+            duration_seconds: Pre-parsed video duration in seconds
+            analysis_score: Mean analyzer score for the video (0.0 if none)
+
         Returns:
             Tuple of (total_score, score_breakdown)
         """
         statistics = video.get("statistics", {})
-        content_details = video.get("contentDetails", {})
         snippet = video.get("snippet", {})
 
         view_count = int(statistics.get("viewCount", 0))
         like_count = int(statistics.get("likeCount", 0))
-        duration_str = content_details.get("duration", "PT0S")
-        published_at = snippet.get("publishedAt", "")
-
-        duration_seconds = YouTubeService.parse_duration(duration_str)
+        days_old = self.days_since_published(snippet.get("publishedAt", ""))
 
         # Calculate individual scores
         relevance = self.calculate_relevance_score(search_rank, max_results)
         like_ratio = self.calculate_like_ratio_score(view_count, like_count)
         views = self.calculate_view_score(view_count, all_view_counts)
-        recency = self.calculate_recency_score(published_at)
+        recency = self.calculate_recency_score(days_old)
         duration_match = self.calculate_duration_match_score(
             duration_seconds, duration_preference
         )
 
         # Apply weights
         breakdown = ScoreBreakdown(
-            relevance=relevance * self.weights["relevance_weight"],
-            like_ratio=like_ratio * self.weights["like_ratio_weight"],
-            views=views * self.weights["view_count_weight"],
-            recency=recency * self.weights["recency_weight"],
-            duration_match=duration_match * self.weights["duration_match_weight"],
+            relevance=relevance * self.weights.relevance,
+            like_ratio=like_ratio * self.weights.like_ratio,
+            views=views * self.weights.view_count,
+            recency=recency * self.weights.recency,
+            duration_match=duration_match * self.weights.duration_match,
+            comment_quality=analysis_score * self.weights.comment_quality,
         )
 
         total_score = (
@@ -220,15 +297,143 @@ class Recommender:
             + breakdown.views
             + breakdown.recency
             + breakdown.duration_match
+            + breakdown.comment_quality
         )
 
         return total_score, breakdown
 
+    @staticmethod
+    def _parse_published(published_at: List[str]) -> np.ndarray:
+        """Parse YouTube publish timestamps into datetime64[s], NaT if unparseable.
+
+        YouTube returns UTC timestamps like "2024-01-15T10:00:00Z"; the first
+        19 characters drop the "Z" suffix and any fractional seconds.
+        """
+        try:
+            return np.array([p[:19] for p in published_at], dtype="datetime64[s]")
+        except ValueError:
+            pubs = np.empty(len(published_at), dtype="datetime64[s]")
+            for i, p in enumerate(published_at):
+                try:
+                    pubs[i] = np.datetime64(p[:19], "s")
+                except ValueError:
+                    pubs[i] = np.datetime64("NaT")
+            return pubs
+
+    def _score_batch(
+        self,
+        videos: List[dict],
+        duration_preference: Optional[str] = None,
+        analysis: Optional[Dict[str, List[AnalysisResult]]] = None,
+    ) -> tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Score all videos in one batch.
+
+        The per-video rules run in the _scoring_numba kernels, which mirror
+        the calculate_*_score methods. Analyzer scores, when given, are
+        averaged per video into the comment_quality column.
+
+        Returns:
+            Tuple of (total_scores, weighted score columns keyed by ScoreBreakdown field)
+        """
+        n = len(videos)
+        max_results = self.filters["default_max_results"]
+
+        ranks = np.fromiter(
+            (v.get("search_rank", 999) for v in videos), dtype=np.int64, count=n
+        )
+        view_counts = np.fromiter(
+            (int(v.get("statistics", {}).get("viewCount", 0)) for v in videos),
+            dtype=np.int64,
+            count=n,
+        )
+        like_counts = np.fromiter(
+            (int(v.get("statistics", {}).get("likeCount", 0)) for v in videos),
+            dtype=np.int64,
+            count=n,
+        )
+        durations = np.fromiter(
+            (v["_dur_s"] for v in videos), dtype=np.float64, count=n
+        )
+        pubs = self._parse_published(
+            [v.get("snippet", {}).get("publishedAt", "") for v in videos]
+        )
+        # Whole days, NaN where the date could not be parsed
+        days_old = np.floor((np.datetime64("now", "s") - pubs) / np.timedelta64(1, "D"))
+
+        relevance, like_ratio, views, recency, duration_match = score_components(
+            ranks,
+            view_counts,
+            like_counts,
+            durations,
+            days_old,
+            max_results,
+            PREFERENCE_CODES.get(duration_preference, PREF_ANY),
+            self._short_max,
+            self._med_min,
+            self._med_max,
+            self._long_min,
+        )
+
+        analysis = analysis or {}
+        comment_quality = np.fromiter(
+            (
+                sum(r.score for r in results) / len(results) if results else 0.0
+                for results in (analysis.get(v["id"]) for v in videos)
+            ),
+            dtype=np.float64,
+            count=n,
+        )
+
+        columns = {
+            "relevance": relevance * self.weights.relevance,
+            "like_ratio": like_ratio * self.weights.like_ratio,
+            "views": views * self.weights.view_count,
+            "recency": recency * self.weights.recency,
+            "duration_match": duration_match * self.weights.duration_match,
+            "comment_quality": comment_quality * self.weights.comment_quality,
+        }
+        total = (
+            columns["relevance"]
+            + columns["like_ratio"]
+            + columns["views"]
+            + columns["recency"]
+            + columns["duration_match"]
+            + columns["comment_quality"]
+        )
+        return total, columns
+
+    async def analyze_all(
+        self, videos: List[dict]
+    ) -> Dict[str, List[AnalysisResult]]:
+        """Run every enabled analyzer over every video concurrently.
+
+        Returns:
+            Mapping of video_id to the list of analyzer results for it
+        """
+        analyzers = [a for a in self.analyzers if a.is_enabled]
+        if not analyzers or not videos:
+            return {}
+
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_ANALYSES)
+
+        async def run(analyzer: BaseAnalyzer, video: dict) -> AnalysisResult:
+            async with semaphore:
+                return await analyzer.analyze(video["id"], video)
+
+        pairs = [(video, analyzer) for video in videos for analyzer in analyzers]
+        results = await asyncio.gather(*(run(a, v) for v, a in pairs))
+
+        analysis: Dict[str, List[AnalysisResult]] = {}
+        for (video, _), result in zip(pairs, results):
+            analysis.setdefault(video["id"], []).append(result)
+        return analysis
+
     def rank_videos(
         self,
         videos: List[dict],
         duration_preference: Optional[str] = None,
         top_n: Optional[int] = None,
+        analysis: Optional[Dict[str, List[AnalysisResult]]] = None,
     ) -> List[VideoRecommendation]:
         """Rank videos and return top recommendations.
 
@@ -236,6 +441,7 @@ class Recommender:
             videos: List of video data from YouTube API
             duration_preference: User's duration preference
             top_n: Number of recommendations to return (default from config)
+            analysis: Analyzer results from analyze_all, keyed by video ID
 
         Returns:
             List of VideoRecommendation objects, sorted by score descending
@@ -243,31 +449,30 @@ class Recommender:
         if top_n is None:
             top_n = self.filters["final_recommendations"]
 
-        max_results = self.filters["default_max_results"]
+        if not videos:
+            return []
+
+        # Parse and format each duration once; reused for scoring and output
+        for v in videos:
+            v["_dur_s"] = YouTubeService.parse_duration(
+                v.get("contentDetails", {}).get("duration", "PT0S")
+            )
+            v["_dur_fmt"] = YouTubeService.format_duration(v["_dur_s"])
 
-        # Collect all view counts for normalization
-        all_view_counts = [
-            int(v.get("statistics", {}).get("viewCount", 0)) for v in videos
-        ]
+        totals, columns = self._score_batch(videos, duration_preference, analysis)
+
+        # Pick winners by index; only they get materialized as dataclasses
+        winners = np.argsort(-np.round(totals, 4), kind="stable")[:top_n]
 
         recommendations = []
-        for video in videos:
-            search_rank = video.get("search_rank", 999)
-            score, breakdown = self.calculate_score(
-                video=video,
-                search_rank=search_rank,
-                max_results=max_results,
-                all_view_counts=all_view_counts,
-                duration_preference=duration_preference,
+        for i in winners:
+            video = videos[i]
+            breakdown = ScoreBreakdown(
+                **{name: round(float(column[i]), 4) for name, column in columns.items()}
             )
 
             snippet = video.get("snippet", {})
             statistics = video.get("statistics", {})
-            content_details = video.get("contentDetails", {})
-
-            duration_seconds = YouTubeService.parse_duration(
-                content_details.get("duration", "PT0S")
-            )
 
             rec = VideoRecommendation(
                 video_id=video["id"],
@@ -276,17 +481,14 @@ class Recommender:
                 thumbnail=snippet.get("thumbnails", {})
                 .get("high", {})
                 .get("url", ""),
-                duration=YouTubeService.format_duration(duration_seconds),
-                duration_seconds=duration_seconds,
+                duration=video["_dur_fmt"],
+                duration_seconds=video["_dur_s"],
                 view_count=int(statistics.get("viewCount", 0)),
                 like_count=int(statistics.get("likeCount", 0)),
                 published_at=snippet.get("publishedAt", ""),
-                score=round(score, 4),
+                score=round(float(totals[i]), 4),
                 score_breakdown=breakdown,
             )
             recommendations.append(rec)
 
-        # Sort by score descending
-        recommendations.sort(key=lambda x: x.score, reverse=True)
-
-        return recommendations[:top_n]
+        return recommendations
@@ -1,22 +1,67 @@
 import os
 import re
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import List, Optional
 
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+import httpx
+import orjson
+
+YOUTUBE_API_URL = "https://www.googleapis.com/youtube/v3/"
+
+# Partial responses: request only the fields the recommender reads
+SEARCH_FIELDS = "items(id/videoId)"
+VIDEO_FIELDS = (
+    "items(id,snippet(title,channelTitle,publishedAt,thumbnails/high/url),"
+    "statistics(viewCount,likeCount),contentDetails/duration)"
+)
+
+# Day form YouTube uses for very long videos, e.g. "P1DT2H3M4S"
+_DUR_RE = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
 
 
 class YouTubeService:
     """Service for interacting with YouTube Data API v3"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
         self.api_key = api_key or os.getenv("YOUTUBE_API_KEY")
         if not self.api_key:
             raise ValueError("YouTube API key is required")
-        self.youtube = build("youtube", "v3", developerKey=self.api_key)
+        self.client = client
+
+    async def _get(self, path: str, params: dict) -> dict:
+        """Call a YouTube Data API REST endpoint and return the decoded JSON body.
+
+        Args:
+            path: Endpoint path relative to the API root (e.g., "search")
+            params: Query parameters, without the API key
 
-    def search_videos(
+        Returns:
+            Decoded JSON response
+        """
+        if self.client is None:
+            raise RuntimeError("YouTubeService requires an httpx client")
+
+        response = await self.client.get(
+            YOUTUBE_API_URL + path,
+            params={**params, "key": self.api_key},
+        )
+        if response.status_code != 200:
+            # Error bodies are usually JSON, but proxies may return HTML
+            message = response.reason_phrase
+            try:
+                error = orjson.loads(response.content).get("error", {})
+                message = error.get("message", message)
+            except (orjson.JSONDecodeError, AttributeError):
+                pass
+            raise Exception(f"YouTube API error: {response.status_code} {message}")
+        return orjson.loads(response.content)
+
+    async def search_videos(
         self,
         query: str,
         max_results: int = 15,
@@ -32,15 +77,16 @@ class YouTubeService:
             video_duration: Filter by duration - "short" (<4min), "medium" (4-20min), "long" (>20min)
 
         Returns:
-            List of video search results with basic info
+            List of video search results, trimmed to their video IDs
         """
         search_params = {
             "q": query,
             "part": "snippet",
             "type": "video",
-            "maxResults": max_results,
+            "maxResults": str(max_results),
             "order": "relevance",
             "videoEmbeddable": "true",
+            "fields": SEARCH_FIELDS,
         }
 
         if published_after:
@@ -50,12 +96,12 @@ class YouTubeService:
             search_params["videoDuration"] = video_duration
 
         try:
-            response = self.youtube.search().list(**search_params).execute()
+            response = await self._get("search", search_params)
             return response.get("items", [])
-        except HttpError as e:
+        except httpx.HTTPError as e:
             raise Exception(f"YouTube API error: {e}")
 
-    def get_video_details(self, video_ids: List[str]) -> List[dict]:
+    async def get_video_details(self, video_ids: List[str]) -> List[dict]:
         """Get detailed statistics for videos.
 
         Args:
@@ -68,19 +114,19 @@ class YouTubeService:
             return []
 
         try:
-            response = (
-                self.youtube.videos()
-                .list(
-                    part="snippet,statistics,contentDetails",
-                    id=",".join(video_ids),
-                )
-                .execute()
+            response = await self._get(
+                "videos",
+                {
+                    "part": "snippet,statistics,contentDetails",
+                    "id": ",".join(video_ids),
+                    "fields": VIDEO_FIELDS,
+                },
             )
             return response.get("items", [])
-        except HttpError as e:
+        except httpx.HTTPError as e:
             raise Exception(f"YouTube API error: {e}")
 
-    def search_and_get_details(
+    async def search_and_get_details(
         self,
         query: str,
         max_results: int = 15,
@@ -94,7 +140,7 @@ class YouTubeService:
         Returns:
             List of videos with full details including statistics
         """
-        search_results = self.search_videos(
+        search_results = await self.search_videos(
             query=query,
             max_results=max_results,
             published_after=published_after,
@@ -105,7 +151,7 @@ class YouTubeService:
             return []
 
         video_ids = [item["id"]["videoId"] for item in search_results]
-        video_details = self.get_video_details(video_ids)
+        video_details = await self.get_video_details(video_ids)
 
         # Create a map of video_id to search rank
         rank_map = {item["id"]["videoId"]: idx for idx, item in enumerate(search_results)}
@@ -117,6 +163,7 @@ class YouTubeService:
         return video_details
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def parse_duration(duration_str: str) -> int:
         """Parse ISO 8601 duration string to seconds.
 
@@ -126,16 +173,32 @@ class YouTubeService:
         Returns:
             Duration in seconds
         """
-        pattern = r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?"
-        match = re.match(pattern, duration_str)
-        if not match:
-            return 0
-
-        hours = int(match.group(1) or 0)
-        minutes = int(match.group(2) or 0)
-        seconds = int(match.group(3) or 0)
-
-        return hours * 3600 + minutes * 60 + seconds
+        if not duration_str.startswith("PT"):
+            match = _DUR_RE.match(duration_str)
+            if not match:
+                return 0
+            days = int(match.group(1) or 0)
+            hours = int(match.group(2) or 0)
+            minutes = int(match.group(3) or 0)
+            seconds = int(match.group(4) or 0)
+            return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+        # Single pass over "H/M/S" components, avoiding regex dispatch
+        total = 0
+        n = 0
+        for c in duration_str[2:]:
+            if c.isdigit():
+                n = n * 10 + ord(c) - 48
+            elif c == "H":
+                total += n * 3600
+                n = 0
+            elif c == "M":
+                total += n * 60
+                n = 0
+            elif c == "S":
+                total += n
+                n = 0
+        return total
 
     @staticmethod
     def format_duration(seconds: int) -> str:
@@ -6,6 +6,7 @@ export interface ScoreBreakdown {
   views: number;
   recency: number;
   duration_match: number;
+  comment_quality: number;
 }
 
 export interface VideoRecommendation {